@@ -1,95 +1,188 @@
 #!/usr/bin/env python3
 """
 Alert System Module
-Sends notifications via Twilio SMS/WhatsApp with threat snapshots
+Sends notifications with threat snapshots through pluggable channels,
+batching concurrent camera alerts into digests
 """
 
 import cv2
 import os
 import time
+import threading
 import numpy as np
 from datetime import datetime
-from typing import List, Tuple, Optional
+from typing import List, Optional
+from detections import DetectionBatch, class_counts
+from notifiers import Notifier, DemoNotifier, create_notifiers_from_env, DELIVERED, RATE_LIMITED
 
 class AlertSystem:
-    def __init__(self):
-        self.twilio_client = None
+    def __init__(self, notifiers: Optional[List[Notifier]] = None, batch_window: float = 0.0,
+                 channel_rate_limits: Optional[dict] = None):
+        """
+        Args:
+            notifiers: Alert channels to fan out to (default: built from environment variables)
+            batch_window: Seconds to collect alerts from several cameras into one digest (0 = send immediately)
+            channel_rate_limits: Per-channel messages-per-minute limits used when building channels from env
+        """
         self.alert_history = []
         self.max_alerts_per_hour = 10
         self.alert_cooldown = 30  # seconds
+        self.batch_window = batch_window
+        self.pending_alerts = []
+        self.batch_timer = None
+        self.deferred_alerts = {}  # channel -> alerts held back by its rate limit
+        self.lock = threading.Lock()
         
-        # Try to initialize Twilio
-        self.init_twilio()
-    
-    def init_twilio(self):
-        """Initialize Twilio client with fallback to demo mode"""
-        try:
-            from twilio.rest import Client
-            from twilio.base.exceptions import TwilioException
-            
-            # These would be set as environment variables in production
-            # PLACEHOLDER: Insert your Twilio credentials here or set as environment variables
-            account_sid = os.getenv('TWILIO_ACCOUNT_SID', 'YOUR_TWILIO_ACCOUNT_SID')  # PLACEHOLDER
-            auth_token = os.getenv('TWILIO_AUTH_TOKEN', 'YOUR_TWILIO_AUTH_TOKEN')    # PLACEHOLDER
-            from_number = os.getenv('TWILIO_FROM_NUMBER', '+1234567890')             # PLACEHOLDER
-            to_number = os.getenv('TWILIO_TO_NUMBER', '+0987654321')                 # PLACEHOLDER
-            
-            if all([account_sid, auth_token, from_number, to_number]):
-                self.twilio_client = Client(account_sid, auth_token)
-                self.from_number = from_number
-                self.to_number = to_number
-                print("Twilio client initialized successfully!")
-            else:
-                print("Twilio credentials not found - running in DEMO MODE")
-                print("Set environment variables: TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN, etc.")
-                self.twilio_client = None
-                
-        except ImportError:
-            print("Twilio not installed - running in DEMO MODE")
-            print("Install with: pip install twilio")
-            self.twilio_client = None
-        except Exception as e:
-            print(f"Error initializing Twilio: {e}")
-            print("Falling back to DEMO MODE")
-            self.twilio_client = None
+        if notifiers is None:
+            notifiers = create_notifiers_from_env(channel_rate_limits)
+        self.notifiers = notifiers
+        self.demo_notifier = DemoNotifier()
+        
+        if not self.notifiers:
+            print("No alert channels configured - running in DEMO MODE")
     
-    def send_alert(self, frame: np.ndarray, threats: List[str], boxes: List[Tuple[int, int, int, int]]):
+    def send_alert(self, frame: np.ndarray, detections: DetectionBatch, camera_id: int = 1, ctx=None):
         """
         Send alert with threat information and snapshot
         Args:
             frame: Current video frame
-            threats: List of detected threats
-            boxes: List of threat bounding boxes
+            detections: Detected threats to report
+            camera_id: Camera the frame came from
+            ctx: The frame's TimeContext (default: read the wall clock)
         """
-        current_time = time.time()
+        now = ctx.now if ctx is not None else datetime.now()
+        current_time = now.timestamp()
         
-        # Check rate limiting
-        if not self._can_send_alert(current_time):
-            return
+        with self.lock:
+            # Check rate limiting
+            if not self._can_send_alert(current_time, camera_id):
+                return
+            
+            # Save snapshot
+            snapshot_path = self._save_snapshot(frame, detections, camera_id, now)
+            threats = detections.names()
+            
+            # Record alert
+            alert = {
+                'timestamp': current_time,
+                'camera_id': camera_id,
+                'threats': threats,
+                'class_ids': detections.class_ids.copy(),
+                'message': self._create_alert_message(threats, camera_id, now),
+                'snapshot': snapshot_path
+            }
+            self.alert_history.append(alert)
+            self.pending_alerts.append(alert)
+            
+            if self.batch_window <= 0:
+                batch = self._take_pending()
+            else:
+                # First alert of a window arms the timer; later ones join the same digest
+                if self.batch_timer is None:
+                    self.batch_timer = threading.Timer(self.batch_window, self.flush)
+                    self.batch_timer.daemon = True
+                    self.batch_timer.start()
+                batch = []
         
-        # Create alert message
-        message = self._create_alert_message(threats)
+        if batch:
+            self._dispatch(batch)
+    
+    def flush(self):
+        """Send all pending alerts (and any retries deferred by rate limits) as one digest"""
+        with self.lock:
+            batch = self._take_pending()
+            has_deferred = bool(self.deferred_alerts)
+        if batch or has_deferred:
+            self._dispatch(batch)
+    
+    def close(self):
+        """Flush pending alerts and close channel connections"""
+        self.flush()
         
-        # Save snapshot
-        snapshot_path = self._save_snapshot(frame, threats, boxes)
+        # Channels still out of tokens at shutdown: show the alerts rather than lose them
+        with self.lock:
+            if self.batch_timer is not None:
+                self.batch_timer.cancel()
+                self.batch_timer = None
+            leftovers = {}
+            for alerts in self.deferred_alerts.values():
+                for alert in alerts:
+                    leftovers[id(alert)] = alert
+            self.deferred_alerts = {}
+        if leftovers:
+            print(f"{len(leftovers)} alert(s) still rate limited at shutdown")
+            self._send_through(self.demo_notifier, sorted(leftovers.values(), key=lambda a: a['timestamp']))
         
-        # Send alert
-        if self.twilio_client:
-            self._send_twilio_alert(message, snapshot_path)
-        else:
-            self._send_demo_alert(message, snapshot_path)
+        for notifier in self.notifiers:
+            notifier.close()
+    
+    def _take_pending(self) -> List[dict]:
+        """Detach the pending batch (caller holds the lock)"""
+        if self.batch_timer is not None:
+            self.batch_timer.cancel()
+            self.batch_timer = None
+        batch = self.pending_alerts
+        self.pending_alerts = []
+        return batch
+    
+    def _build_message(self, alerts: List[dict]) -> str:
+        if len(alerts) == 1:
+            return alerts[0]['message']
+        return self._create_digest_message(alerts)
+    
+    def _send_through(self, notifier: Notifier, alerts: List[dict]) -> str:
+        """Send one message covering the given alerts through a single channel"""
+        snapshot_paths = [alert['snapshot'] for alert in alerts]
+        records = [
+            {
+                'timestamp': alert['timestamp'],
+                'camera_id': alert['camera_id'],
+                'threats': alert['threats'],
+                'snapshot': alert['snapshot']
+            }
+            for alert in alerts
+        ]
+        return notifier.notify(self._build_message(alerts), snapshot_paths, records)
+    
+    def _dispatch(self, batch: List[dict]):
+        """Fan a batch of alerts out to every channel"""
+        delivered = []
+        any_deferred = False
+        retry_delay = None
+        
+        for notifier in self.notifiers:
+            # Alerts a channel could not take earlier go out with this digest
+            with self.lock:
+                alerts = self.deferred_alerts.pop(notifier, []) + batch
+            if not alerts:
+                continue
+            
+            status = self._send_through(notifier, alerts)
+            if status == DELIVERED:
+                delivered.append(self._build_message(alerts))
+            elif status == RATE_LIMITED:
+                with self.lock:
+                    self.deferred_alerts[notifier] = alerts + self.deferred_alerts.get(notifier, [])
+                any_deferred = True
+                wait = max(notifier.rate_limiter.wait_time(), 1.0)
+                retry_delay = wait if retry_delay is None else min(retry_delay, wait)
         
-        # Record alert
-        self.alert_history.append({
-            'timestamp': current_time,
-            'threats': threats,
-            'message': message,
-            'snapshot': snapshot_path
-        })
+        # Fallback to demo mode when no channel took or queued the message
+        if batch and not delivered and not any_deferred:
+            if self._send_through(self.demo_notifier, batch) == DELIVERED:
+                delivered.append(self._build_message(batch))
         
-        print(f"🚨 ALERT SENT: {message}")
+        if retry_delay is not None:
+            with self.lock:
+                if self.batch_timer is None:
+                    self.batch_timer = threading.Timer(max(retry_delay, self.batch_window), self.flush)
+                    self.batch_timer.daemon = True
+                    self.batch_timer.start()
+        
+        for message in dict.fromkeys(delivered):
+            print(f"🚨 ALERT SENT: {message}")
     
-    def _can_send_alert(self, current_time: float) -> bool:
+    def _can_send_alert(self, current_time: float, camera_id: int = 1) -> bool:
         """Check if we can send an alert (rate limiting)"""
         # Remove old alerts (older than 1 hour)
         self.alert_history = [
@@ -101,17 +194,19 @@ class AlertSystem:
         if len(self.alert_history) >= self.max_alerts_per_hour:
             return False
         
-        # Check cooldown period
-        if self.alert_history:
-            last_alert_time = self.alert_history[-1]['timestamp']
-            if current_time - last_alert_time < self.alert_cooldown:
-                return False
+        # Check cooldown period (per camera, so other cameras can join the same digest)
+        for alert in reversed(self.alert_history):
+            if alert['camera_id'] == camera_id:
+                if current_time - alert['timestamp'] < self.alert_cooldown:
+                    return False
+                break
         
         return True
     
-    def _create_alert_message(self, threats: List[str]) -> str:
+    def _create_alert_message(self, threats: List[str], camera_id: int = 1,
+                              now: Optional[datetime] = None) -> str:
         """Create alert message from threat list"""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        timestamp = (now or datetime.now()).strftime("%Y-%m-%d %H:%M:%S")
         
         if len(threats) == 1:
             threat_text = threats[0]
@@ -121,24 +216,39 @@ class AlertSystem:
         message = f"🚨 SECURITY ALERT 🚨\n"
         message += f"Time: {timestamp}\n"
         message += f"Threat Detected: {threat_text}\n"
-        message += f"Location: Surveillance Camera 1\n"
+        message += f"Location: Surveillance Camera {camera_id}\n"
         message += f"Action Required: Immediate attention needed"
         
         return message
     
-    def _save_snapshot(self, frame: np.ndarray, threats: List[str], 
-                      boxes: List[Tuple[int, int, int, int]]) -> str:
+    def _create_digest_message(self, batch: List[dict]) -> str:
+        """Merge several camera alerts into a single digest message"""
+        # Digest time is that of its latest alert, so it follows the frame clock too
+        timestamp = datetime.fromtimestamp(max(alert['timestamp'] for alert in batch)).strftime("%Y-%m-%d %H:%M:%S")
+        
+        message = f"🚨 SECURITY ALERT DIGEST 🚨\n"
+        message += f"Time: {timestamp}\n"
+        message += f"Alerts: {len(batch)} from {len({alert['camera_id'] for alert in batch})} camera(s)\n"
+        for alert in batch:
+            alert_time = datetime.fromtimestamp(alert['timestamp']).strftime("%H:%M:%S")
+            message += f"- Camera {alert['camera_id']} @ {alert_time}: {', '.join(alert['threats'])}\n"
+        message += f"Action Required: Immediate attention needed"
+        
+        return message
+    
+    def _save_snapshot(self, frame: np.ndarray, detections: DetectionBatch, camera_id: int = 1,
+                       now: Optional[datetime] = None) -> str:
         """Save threat snapshot with annotations"""
         # Create snapshots directory if it doesn't exist
         os.makedirs('snapshots', exist_ok=True)
         
         # Create timestamped filename
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"snapshots/threat_{timestamp}.jpg"
+        timestamp = (now or datetime.now()).strftime("%Y%m%d_%H%M%S")
+        filename = f"snapshots/threat_cam{camera_id}_{timestamp}.jpg"
         
         # Draw threat annotations on snapshot
         snapshot = frame.copy()
-        for i, (threat, box) in enumerate(zip(threats, boxes)):
+        for threat, box, _ in detections:
             x1, y1, x2, y2 = box
             
             # Draw bounding box
@@ -158,49 +268,18 @@ class AlertSystem:
         cv2.imwrite(filename, snapshot)
         return filename
     
-    def _send_twilio_alert(self, message: str, snapshot_path: str):
-        """Send alert via Twilio SMS/WhatsApp"""
-        try:
-            # Send text message
-            self.twilio_client.messages.create(
-                body=message,
-                from_=self.from_number,
-                to=self.to_number
-            )
-            
-            # TODO: Send image via MMS (requires different Twilio endpoint)
-            # For demo purposes, we'll just send the text message
-            
-        except Exception as e:
-            print(f"Error sending Twilio alert: {e}")
-            # Fallback to demo mode
-            self._send_demo_alert(message, snapshot_path)
-    
-    def _send_demo_alert(self, message: str, snapshot_path: str):
-        """Demo alert - simulates sending notification"""
-        print("\n" + "="*50)
-        print("📱 DEMO ALERT SIMULATION")
-        print("="*50)
-        print(f"To: +1234567890")
-        print(f"From: +1987654321")
-        print(f"Message: {message}")
-        print(f"Snapshot: {snapshot_path}")
-        print("="*50)
-        print("In production, this would be sent via Twilio SMS/WhatsApp")
-        print("="*50 + "\n")
-    
-    def get_alert_summary(self) -> dict:
+    def get_alert_summary(self, ctx=None) -> dict:
         """Get summary of recent alerts"""
-        current_time = time.time()
+        current_time = ctx.timestamp if ctx is not None else time.time()
         recent_alerts = [
             alert for alert in self.alert_history 
             if current_time - alert['timestamp'] < 3600  # Last hour
         ]
         
-        threat_counts = {}
-        for alert in recent_alerts:
-            for threat in alert['threats']:
-                threat_counts[threat] = threat_counts.get(threat, 0) + 1
+        if recent_alerts:
+            threat_counts = class_counts(np.concatenate([alert['class_ids'] for alert in recent_alerts]))
+        else:
+            threat_counts = {}
         
         return {
             'total_alerts': len(recent_alerts),
@@ -6,7 +6,7 @@ Blurs faces of non-threat individuals while keeping threats visible
 
 import cv2
 import numpy as np
-from typing import List, Tuple, Optional
+from detections import DetectionBatch, points_in_boxes
 
 class FaceBlurrer:
     def __init__(self):
@@ -32,13 +32,12 @@ class FaceBlurrer:
             print("Running without face blurring")
             self.face_cascade = None
     
-    def blur_faces(self, frame: np.ndarray, threats: List[str], threat_boxes: List[Tuple[int, int, int, int]]) -> np.ndarray:
+    def blur_faces(self, frame: np.ndarray, detections: DetectionBatch) -> np.ndarray:
         """
         Blur faces in the frame, except for those in threat areas
         Args:
             frame: Input frame
-            threats: List of detected threat types
-            threat_boxes: List of threat bounding boxes
+            detections: Threat detections for this frame
         Returns:
             Frame with faces blurred
         """
@@ -56,38 +55,36 @@ class FaceBlurrer:
             minSize=(30, 30)
         )
         
+        # Check all faces against all threat areas in one pass
+        faces = np.asarray(faces, dtype=np.int32).reshape(-1, 4)
+        visible = self._faces_in_threat_area(faces, detections)
+        
         # Create a copy of the frame for blurring
         blurred_frame = frame.copy()
         
-        for (x, y, w, h) in faces:
-            # Check if this face is in a threat area
-            if not self._is_face_in_threat_area(x, y, w, h, threat_boxes, threats):
-                # Blur this face
-                face_roi = blurred_frame[y:y+h, x:x+w]
-                blurred_face = self._apply_blur(face_roi)
-                blurred_frame[y:y+h, x:x+w] = blurred_face
+        for (x, y, w, h) in faces[~visible].tolist():
+            # Blur this face
+            face_roi = blurred_frame[y:y+h, x:x+w]
+            blurred_face = self._apply_blur(face_roi)
+            blurred_frame[y:y+h, x:x+w] = blurred_face
         
         return blurred_frame
     
-    def _is_face_in_threat_area(self, face_x: int, face_y: int, face_w: int, face_h: int, 
-                               threat_boxes: List[Tuple[int, int, int, int]], 
-                               threats: List[str]) -> bool:
+    def _faces_in_threat_area(self, faces: np.ndarray, detections: DetectionBatch) -> np.ndarray:
         """
-        Check if a face overlaps with any threat area
-        Returns True if face should NOT be blurred (it's a threat)
+        Check which faces overlap with a threat area
+        Args:
+            faces: (N, 4) array of x, y, w, h face rectangles
+            detections: Threat detections for this frame
+        Returns:
+            (N,) boolean array, True where the face should NOT be blurred (it's a threat)
         """
-        face_center_x = face_x + face_w // 2
-        face_center_y = face_y + face_h // 2
-        
-        for i, (threat_x1, threat_y1, threat_x2, threat_y2) in enumerate(threat_boxes):
-            # Only consider person threats for face blurring logic
-            if threats[i] == "person":
-                # Check if face center is within threat box
-                if (threat_x1 <= face_center_x <= threat_x2 and 
-                    threat_y1 <= face_center_y <= threat_y2):
-                    return True
+        # Only consider person threats for face blurring logic
+        person_boxes = detections.boxes[detections.mask_for("person")]
         
-        return False
+        # Check if face center is within threat box
+        centers = faces[:, :2] + faces[:, 2:] // 2
+        return points_in_boxes(centers, person_boxes)
     
     def _apply_blur(self, roi: np.ndarray) -> np.ndarray:
         """Apply Gaussian blur to a region of interest"""
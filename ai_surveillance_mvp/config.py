@@ -5,7 +5,10 @@ Centralized settings for the AI Surveillance MVP
 """
 
 import os
-from datetime import datetime, time
+from datetime import datetime
+from typing import Optional
+from regions import CameraRegions
+from schedule import Schedule, ScheduleEngine, TimeContext
 
 class Config:
     def __init__(self):
@@ -16,14 +19,39 @@ class Config:
         # Time Settings
         self.restricted_start_hour = 22  # 10 PM
         self.restricted_end_hour = 6    # 6 AM
+        # Equal start and end hours disable the daily window (holidays still apply);
+        # use the weekly schedule below, e.g. [(range(7), 0, 0)], to restrict whole days
+        # Optional weekly calendar: list of (weekdays, start, end), Monday = 0, e.g.
+        # [((0, 1, 2, 3, 4, 6), "18:30", "07:00"), ((5, 6), 0, 0)]  # weeknights + all weekend
+        # A window that wraps past midnight belongs to the day it starts on, so Sunday (6)
+        # needs its own evening window to cover Monday 00:00 - 07:00
+        # When empty, the restricted hours above apply every day
+        self.weekly_schedule = []
+        self.holidays = []              # datetime.date values restricted all day
+        self.camera_schedules = {}      # camera id -> weekly schedule override
+        self.zone_schedules = {}        # zone name -> weekly schedule override
+        self.clock = datetime.now       # Injectable for tests and replays
         
         # Detection Settings
         self.confidence_threshold = 0.5
         self.detection_interval = 1  # Process every N frames
         
+        # Region Settings (per camera id, pixel coordinates)
+        # Inference ROI: (x1, y1, x2, y2) or list of polygons; frames are cropped to its bounding box
+        self.camera_rois = {}           # e.g. {1: (0, 120, 640, 480)}
+        # Ignore masks: polygons where detections are dropped (sky, walls, DVR timestamps)
+        self.camera_ignore_masks = {}   # e.g. {1: [[(0, 0), (220, 0), (220, 30), (0, 30)]]}
+        
         # Alert Settings
         self.alert_cooldown = 30  # seconds between alerts
         self.max_alerts_per_hour = 10
+        self.alert_batch_window = 5  # seconds to merge alerts from several cameras into one digest
+        self.channel_rate_limits = {  # messages per minute per alert channel (None = unlimited)
+            "twilio": 6,
+            "smtp": 20,
+            "webhook": None,
+            "file": None
+        }
         
         # Privacy Settings
         self.blur_strength = 15
@@ -37,29 +65,74 @@ class Config:
         # File Paths
         self.snapshots_dir = "snapshots"
         self.logs_dir = "logs"
+        self.recordings_dir = "recordings"  # Cached detector output for replay runs
         
         # Create necessary directories
         self._create_directories()
+        
+        # After-hours schedules are compiled into transition tables on first use and
+        # recompiled whenever the settings above change (see the schedule property)
+        self._schedule = None
+        self._schedule_source = None
     
     def _create_directories(self):
         """Create necessary directories if they don't exist"""
         os.makedirs(self.snapshots_dir, exist_ok=True)
         os.makedirs(self.logs_dir, exist_ok=True)
     
-    def is_after_hours(self) -> bool:
-        """Check if current time is during restricted hours"""
+    def get_camera_regions(self) -> dict:
+        """Build CameraRegions for every camera with an ROI or ignore mask configured"""
+        camera_ids = set(self.camera_rois) | set(self.camera_ignore_masks)
+        return {
+            camera_id: CameraRegions(roi=self.camera_rois.get(camera_id),
+                                     ignore=self.camera_ignore_masks.get(camera_id))
+            for camera_id in camera_ids
+        }
+    
+    def _schedule_settings(self) -> tuple:
+        """Snapshot of every setting the compiled schedules depend on"""
+        # repr() also catches in-place edits such as holidays.append(...)
+        return (self.restricted_start_hour, self.restricted_end_hour, repr(self.weekly_schedule),
+                repr(self.holidays), repr(self.camera_schedules), repr(self.zone_schedules))
+    
+    @property
+    def schedule(self) -> ScheduleEngine:
+        """Compiled schedules, rebuilt when restricted hours, calendars or holidays change"""
+        if self._schedule_settings() != self._schedule_source:
+            self.rebuild_schedule()
+        return self._schedule
+    
+    def rebuild_schedule(self):
+        """Compile restricted hours, calendars and holidays into transition tables"""
+        self._schedule_source = self._schedule_settings()
+        if self.weekly_schedule:
+            default = Schedule(self.weekly_schedule, self.holidays)
+        elif self.restricted_start_hour == self.restricted_end_hour:
+            default = Schedule([], self.holidays)
+        else:
+            default = Schedule.daily(self.restricted_start_hour, self.restricted_end_hour, self.holidays)
+        
+        self._schedule = ScheduleEngine(
+            default,
+            camera_schedules={camera_id: Schedule(windows, self.holidays)
+                              for camera_id, windows in self.camera_schedules.items()},
+            zone_schedules={zone: Schedule(windows, self.holidays)
+                            for zone, windows in self.zone_schedules.items()}
+        )
+    
+    def time_context(self, now: Optional[datetime] = None) -> TimeContext:
+        """Read the clock once and share the result with every check in a frame"""
+        return TimeContext(now or self.clock(), self.schedule)
+    
+    def is_after_hours(self, ctx: Optional[TimeContext] = None, camera_id: Optional[int] = None,
+                       zone: Optional[str] = None) -> bool:
+        """Check if the frame time (or current time) is during restricted hours"""
         if not self.after_hours_enabled:
             return False
         
-        current_time = datetime.now().time()
-        start_time = time(self.restricted_start_hour, 0)
-        end_time = time(self.restricted_end_hour, 0)
-        
-        # Handle overnight restriction (e.g., 10 PM to 6 AM)
-        if self.restricted_start_hour > self.restricted_end_hour:
-            return current_time >= start_time or current_time <= end_time
-        else:
-            return start_time <= current_time <= end_time
+        if ctx is None:
+            ctx = self.time_context()
+        return ctx.is_after_hours(camera_id, zone)
     
     def toggle_after_hours(self):
         """Toggle after-hours mode on/off"""
@@ -79,7 +152,7 @@ class Config:
         }
         return priority_map.get(threat_type, 4)  # Default lowest priority
     
-    def should_alert(self, threat_type: str) -> bool:
+    def should_alert(self, threat_type: str, ctx: Optional[TimeContext] = None) -> bool:
         """Determine if a threat should trigger an alert"""
         priority = self.get_threat_priority(threat_type)
         
@@ -88,7 +161,7 @@ class Config:
             return True
         
         # Alert for person during after hours
-        if threat_type == "person" and self.is_after_hours():
+        if threat_type == "person" and self.is_after_hours(ctx):
             return True
         
         # For demo mode, alert for medium priority threats too
@@ -99,24 +172,26 @@ class Config:
     
     def get_demo_settings(self) -> dict:
         """Get demo-specific settings"""
+        ctx = self.time_context()
         return {
             "demo_mode": self.demo_mode,
             "after_hours_enabled": self.after_hours_enabled,
-            "restricted_hours": f"{self.restricted_start_hour}:00 - {self.restricted_end_hour}:00",
-            "current_time": datetime.now().strftime("%H:%M:%S"),
-            "is_after_hours": self.is_after_hours()
+            "restricted_hours": self.schedule.default.describe(),
+            "current_time": ctx.now.strftime("%H:%M:%S"),
+            "is_after_hours": self.is_after_hours(ctx)
         }
     
     def print_status(self):
         """Print current configuration status"""
+        ctx = self.time_context()
         print("\n" + "="*40)
         print("AI SURVEILLANCE MVP - CONFIGURATION")
         print("="*40)
         print(f"Demo Mode: {'ON' if self.demo_mode else 'OFF'}")
         print(f"After Hours Mode: {'ON' if self.after_hours_enabled else 'OFF'}")
-        print(f"Restricted Hours: {self.restricted_start_hour}:00 - {self.restricted_end_hour}:00")
-        print(f"Current Time: {datetime.now().strftime('%H:%M:%S')}")
-        print(f"Is After Hours: {'YES' if self.is_after_hours() else 'NO'}")
+        print(f"Restricted Hours: {self.schedule.default.describe()}")
+        print(f"Current Time: {ctx.now.strftime('%H:%M:%S')}")
+        print(f"Is After Hours: {'YES' if self.is_after_hours(ctx) else 'NO'}")
         print(f"Confidence Threshold: {self.confidence_threshold}")
         print(f"Alert Cooldown: {self.alert_cooldown}s")
         print(f"Max Alerts/Hour: {self.max_alerts_per_hour}")
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Detection Records Module
+Compact NumPy-backed detection batches shared by every pipeline stage
+"""
+
+import numpy as np
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+# One row per detection: interned class id, xyxy box, confidence, source camera, tracker id
+DETECTION_DTYPE = np.dtype([
+    ('class_id', np.int16),
+    ('box', np.float32, (4,)),
+    ('score', np.float32),
+    ('camera_id', np.int16),
+    ('track_id', np.int32),
+])
+
+NO_TRACK = -1
+
+
+class ClassTable:
+    """Interns class names to small integer ids"""
+
+    __slots__ = ('names', 'ids')
+
+    def __init__(self, names: Iterable[str] = ()):
+        self.names: List[str] = []
+        self.ids = {}
+        for name in names:
+            self.intern(name)
+
+    def intern(self, name: str) -> int:
+        """Return the id for a class name, adding it if unseen"""
+        class_id = self.ids.get(name)
+        if class_id is None:
+            class_id = len(self.names)
+            self.ids[name] = class_id
+            self.names.append(name)
+        return class_id
+
+    def id_of(self, name: str) -> int:
+        """Return the id for a class name, or -1 if unknown"""
+        return self.ids.get(name, -1)
+
+    def name_of(self, class_id: int) -> str:
+        return self.names[class_id]
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+
+# Shared table so ids are comparable across detector, blurrer, drawer and alerts
+CLASS_TABLE = ClassTable(['person', 'fire', 'smoke', 'backpack', 'handbag', 'suitcase'])
+
+
+class DetectionBatch:
+    """All detections of one frame stored in a single structured array"""
+
+    __slots__ = ('records', 'class_table')
+
+    def __init__(self, records: Optional[np.ndarray] = None, class_table: ClassTable = CLASS_TABLE):
+        self.records = records if records is not None else np.empty(0, dtype=DETECTION_DTYPE)
+        self.class_table = class_table
+
+    @classmethod
+    def from_arrays(cls, class_ids, boxes, scores, camera_id: int = 1,
+                    track_ids=None, class_table: ClassTable = CLASS_TABLE) -> 'DetectionBatch':
+        """Build a batch from column arrays"""
+        records = np.empty(len(class_ids), dtype=DETECTION_DTYPE)
+        records['class_id'] = class_ids
+        records['box'] = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+        records['score'] = scores
+        records['camera_id'] = camera_id
+        records['track_id'] = NO_TRACK if track_ids is None else track_ids
+        return cls(records, class_table)
+
+    @classmethod
+    def from_lists(cls, threats: List[str], boxes: List[Tuple[int, int, int, int]], scores: List[float],
+                   camera_id: int = 1, class_table: ClassTable = CLASS_TABLE) -> 'DetectionBatch':
+        """Build a batch from the classic parallel (threats, boxes, scores) lists"""
+        class_ids = [class_table.intern(threat) for threat in threats]
+        return cls.from_arrays(class_ids, boxes, scores, camera_id, class_table=class_table)
+
+    @property
+    def class_ids(self) -> np.ndarray:
+        return self.records['class_id']
+
+    @property
+    def boxes(self) -> np.ndarray:
+        return self.records['box']
+
+    @property
+    def scores(self) -> np.ndarray:
+        return self.records['score']
+
+    @property
+    def camera_ids(self) -> np.ndarray:
+        return self.records['camera_id']
+
+    @property
+    def track_ids(self) -> np.ndarray:
+        return self.records['track_id']
+
+    def int_boxes(self) -> np.ndarray:
+        """Boxes as int32 pixel coordinates for drawing"""
+        return self.records['box'].astype(np.int32)
+
+    def names(self) -> List[str]:
+        """Class names of every detection, in order"""
+        names = self.class_table.names
+        return [names[class_id] for class_id in self.records['class_id'].tolist()]
+
+    def mask_for(self, *class_names: str) -> np.ndarray:
+        """Boolean mask of detections belonging to any of the given classes"""
+        ids = [self.class_table.id_of(name) for name in class_names]
+        return np.isin(self.records['class_id'], ids)
+
+    def select(self, mask: np.ndarray) -> 'DetectionBatch':
+        """Sub-batch of the detections picked by a boolean mask or index array"""
+        return DetectionBatch(self.records[mask], self.class_table)
+
+    def shift(self, dx: int, dy: int) -> 'DetectionBatch':
+        """Translate boxes in place, e.g. from crop to full-frame coordinates"""
+        if dx or dy:
+            self.records['box'] += np.array([dx, dy, dx, dy], dtype=np.float32)
+        return self
+
+    def counts(self) -> dict:
+        """Number of detections per class name"""
+        return class_counts(self.records['class_id'], self.class_table)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __iter__(self) -> Iterator[Tuple[str, Tuple[int, int, int, int], float]]:
+        """Yield (class_name, int box, score) tuples"""
+        names = self.class_table.names
+        for class_id, box, score in zip(self.records['class_id'].tolist(),
+                                        self.int_boxes().tolist(),
+                                        self.records['score'].tolist()):
+            yield names[class_id], tuple(box), score
+
+
+def class_counts(class_ids: np.ndarray, class_table: ClassTable = CLASS_TABLE) -> dict:
+    """Count class ids with a single bincount and map them back to names"""
+    if len(class_ids) == 0:
+        return {}
+    counts = np.bincount(np.asarray(class_ids, dtype=np.int64), minlength=len(class_table))
+    present = np.flatnonzero(counts)
+    return {class_table.names[i]: int(counts[i]) for i in present}
+
+
+def points_in_boxes(points: np.ndarray, boxes: np.ndarray) -> np.ndarray:
+    """
+    Vectorized containment test
+    Args:
+        points: (N, 2) array of x, y coordinates
+        boxes: (M, 4) array of x1, y1, x2, y2 boxes
+    Returns:
+        (N,) boolean array, True where a point lies inside any box (edges inclusive)
+    """
+    if len(points) == 0 or len(boxes) == 0:
+        return np.zeros(len(points), dtype=bool)
+    x = points[:, 0:1]
+    y = points[:, 1:2]
+    inside = ((boxes[:, 0] <= x) & (x <= boxes[:, 2]) &
+              (boxes[:, 1] <= y) & (y <= boxes[:, 3]))
+    return inside.any(axis=1)
@@ -7,28 +7,43 @@ Uses YOLOv8 for real-time object detection with fallback demo logic
 import cv2
 import numpy as np
 import time
-from typing import List, Tuple, Optional
+from typing import Tuple, Optional
+from detections import DetectionBatch, CLASS_TABLE
 
 class ThreatDetector:
-    def __init__(self, model_path: str = 'yolov8m.pt', confidence_threshold: float = 0.5, class_thresholds: Optional[dict] = None):
+    def __init__(self, model_path: str = 'yolov8m.pt', confidence_threshold: float = 0.5, class_thresholds: Optional[dict] = None,
+                 camera_regions: Optional[dict] = None, seed: Optional[int] = None, load_model: bool = True):
         """
         Args:
             model_path (str): Path to YOLOv8 model (default: yolov8m.pt for better accuracy)
             confidence_threshold (float): Default detection confidence threshold
             class_thresholds (dict): Optional per-class confidence thresholds
+            camera_regions (dict): Optional camera id -> CameraRegions (inference ROI and ignore masks)
+            seed (int): Makes demo detections deterministic (seeded noise, frame-count clock)
+            load_model (bool): Load the model now; when False it is loaded on first detect()
         """
         self.model = None
-        self.current_threats = []
+        self.current_detections = DetectionBatch()
         self.confidence_threshold = confidence_threshold
         self.class_thresholds = class_thresholds or {}
+        self.camera_regions = camera_regions or {}
+        self.seed = seed
+        self.rng = np.random.RandomState(seed)
+        self.frames_seen = 0
+        self.demo_fps = 30
         self.target_classes = ['person', 'fire', 'smoke', 'backpack', 'handbag', 'suitcase']
         self.model_path = model_path
+        self._lookup_names = None
+        self._lookup = None
+        self.model_loaded = False
         
         # Try to load YOLOv8 model, fallback to demo mode
-        self.load_model()
+        if load_model:
+            self.load_model()
     
     def load_model(self):
         """Load YOLOv8 model with fallback to demo mode"""
+        self.model_loaded = True
         try:
             from ultralytics import YOLO
             print(f"Loading YOLOv8 model from {self.model_path} ...")
@@ -43,52 +58,95 @@ class ThreatDetector:
             print("Falling back to DEMO MODE")
             self.model = None
     
-    def detect(self, frame: np.ndarray) -> Tuple[List[str], List[Tuple[int, int, int, int]], List[float]]:
+    def detect(self, frame: np.ndarray, camera_id: int = 1) -> DetectionBatch:
         """
         Detect threats in the frame
-        Returns: (threat_types, bounding_boxes, confidence_scores)
+        Returns: DetectionBatch with class ids, boxes and confidence scores
         """
+        if not self.model_loaded:
+            self.load_model()
+        
+        regions = self.camera_regions.get(camera_id)
+        
+        # Run inference only on the region that matters, then map boxes back
+        if regions is not None:
+            frame, (x_offset, y_offset) = regions.crop(frame)
+            if frame is None:
+                detections = DetectionBatch.from_arrays([], [], [], camera_id)
+                self.current_detections = detections
+                return detections
+        
         if self.model is not None:
-            return self._detect_with_yolo(frame)
+            detections = self._detect_with_yolo(frame, camera_id)
         else:
-            return self._detect_demo(frame)
+            detections = self._detect_demo(frame, camera_id)
+        
+        if regions is not None:
+            detections = regions.filter(detections.shift(x_offset, y_offset))
+        
+        self.current_detections = detections
+        return detections
     
-    def _detect_with_yolo(self, frame: np.ndarray) -> Tuple[List[str], List[Tuple[int, int, int, int]], List[float]]:
+    def _model_class_lookup(self, model_names: dict) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Map model class indices to interned class ids and per-class thresholds
+        Returns: (class_id lookup with -1 for non-target classes, threshold lookup)
+        """
+        if self._lookup_names is not model_names:
+            size = max(model_names) + 1 if model_names else 0
+            class_ids = np.full(size, -1, dtype=np.int16)
+            thresholds = np.full(size, self.confidence_threshold, dtype=np.float32)
+            for index, class_name in model_names.items():
+                thresholds[index] = self.class_thresholds.get(class_name, self.confidence_threshold)
+                if class_name in self.target_classes:
+                    class_ids[index] = CLASS_TABLE.intern(class_name)
+            self._lookup_names = model_names
+            self._lookup = (class_ids, thresholds)
+        return self._lookup
+    
+    def _detect_with_yolo(self, frame: np.ndarray, camera_id: int = 1) -> DetectionBatch:
         """Real YOLOv8 detection with per-class threshold support"""
         results = self.model(frame, verbose=False)
         
-        threats = []
-        boxes = []
-        scores = []
-        
+        batches = []
         for result in results:
-            if result.boxes is not None:
-                for box in result.boxes:
-                    class_id = int(box.cls[0])
-                    confidence = float(box.conf[0])
-                    class_name = result.names[class_id]
-                    # Use per-class threshold if available
-                    threshold = self.class_thresholds.get(class_name, self.confidence_threshold)
-                    if confidence < threshold:
-                        continue
-                    if class_name in self.target_classes:
-                        x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
-                        x1, y1, x2, y2 = int(x1), int(y1), int(x2), int(y2)
-                        threats.append(class_name)
-                        boxes.append((x1, y1, x2, y2))
-                        scores.append(confidence)
+            if result.boxes is None or len(result.boxes) == 0:
+                continue
+            class_lookup, threshold_lookup = self._model_class_lookup(result.names)
+            
+            model_classes = result.boxes.cls.cpu().numpy().astype(np.int64)
+            confidences = result.boxes.conf.cpu().numpy().astype(np.float32)
+            class_ids = class_lookup[model_classes]
+            
+            # Use per-class threshold if available, and keep only target classes
+            keep = (class_ids >= 0) & (confidences >= threshold_lookup[model_classes])
+            if not keep.any():
+                continue
+            
+            # Truncate to integer pixels like the drawing code expects
+            boxes = np.trunc(result.boxes.xyxy.cpu().numpy()[keep])
+            batches.append(DetectionBatch.from_arrays(class_ids[keep], boxes, confidences[keep], camera_id))
         
-        self.current_threats = threats
-        return threats, boxes, scores
+        if not batches:
+            return DetectionBatch.from_arrays([], [], [], camera_id)
+        if len(batches) == 1:
+            return batches[0]
+        return DetectionBatch(np.concatenate([batch.records for batch in batches]))
     
-    def _detect_demo(self, frame: np.ndarray) -> Tuple[List[str], List[Tuple[int, int, int, int]], List[float]]:
+    def _detect_demo(self, frame: np.ndarray, camera_id: int = 1) -> DetectionBatch:
         """Demo detection - simulates detection for presentation purposes"""
         threats = []
         boxes = []
         scores = []
         
         height, width = frame.shape[:2]
-        current_time = time.time()
+        
+        # Seeded runs advance the demo clock by frame count so results repeat run to run
+        if self.seed is not None:
+            current_time = self.frames_seen / self.demo_fps
+        else:
+            current_time = time.time()
+        self.frames_seen += 1
         
         # Simulate periodic detections for demo
         demo_cycle = int(current_time) % 10  # Changes every 10 seconds
@@ -115,25 +173,21 @@ class ThreatDetector:
             scores.append(0.78)
         
         # Add some random noise for realism
-        if np.random.random() < 0.1:  # 10% chance
-            x1 = np.random.randint(0, width//2)
-            y1 = np.random.randint(0, height//2)
-            x2 = x1 + np.random.randint(50, 150)
-            y2 = y1 + np.random.randint(50, 150)
+        if self.rng.random() < 0.1:  # 10% chance
+            x1 = self.rng.randint(0, width//2)
+            y1 = self.rng.randint(0, height//2)
+            x2 = x1 + self.rng.randint(50, 150)
+            y2 = y1 + self.rng.randint(50, 150)
             
             threat_types = ["backpack", "handbag", "suitcase"]
-            threat = np.random.choice(threat_types)
+            threat = self.rng.choice(threat_types)
             
             threats.append(threat)
             boxes.append((x1, y1, x2, y2))
-            scores.append(np.random.uniform(0.6, 0.9))
+            scores.append(self.rng.uniform(0.6, 0.9))
         
-        self.current_threats = threats
-        return threats, boxes, scores
+        return DetectionBatch.from_lists(threats, boxes, scores, camera_id)
     
     def get_threat_summary(self) -> dict:
         """Get summary of current threats"""
-        threat_counts = {}
-        for threat in self.current_threats:
-            threat_counts[threat] = threat_counts.get(threat, 0) + 1
-        return threat_counts 
\ No newline at end of file
+        return self.current_detections.counts() 
\ No newline at end of file
@@ -5,66 +5,87 @@ Real-time threat detection with privacy protection and alert system
 """
 
 import cv2
-import time
+import os
+import argparse
+import threading
 import numpy as np
-from datetime import datetime
+from datetime import datetime, timedelta
 from detector import ThreatDetector     
 from blur_faces import FaceBlurrer
 from alert import AlertSystem
 from config import Config 
+from replay import DetectionRecorder, ReplayDetector, video_fingerprint, model_key, recording_path, available_models
 
 class SurveillancePipeline:
-    def __init__(self, model_path: str = 'yolov8m.pt', confidence_threshold: float = 0.5, class_thresholds: dict = None):
+    def __init__(self, model_path: str = 'yolov8m.pt', confidence_threshold: float = 0.5, class_thresholds: dict = None,
+                 camera_id: int = 1, seed: int = None, alert_system: AlertSystem = None):
         self.config = Config()
-        self.detector = ThreatDetector(model_path=model_path, confidence_threshold=confidence_threshold, class_thresholds=class_thresholds)
+        self.camera_id = camera_id
+        self.detector = ThreatDetector(model_path=model_path, confidence_threshold=confidence_threshold, class_thresholds=class_thresholds,
+                                       camera_regions=self.config.get_camera_regions(), seed=seed,
+                                       load_model=False)
         self.face_blurrer = FaceBlurrer()
-        self.alert_system = AlertSystem()
+        # Pipelines for several cameras can share one AlertSystem so their alerts merge into one digest
+        self.owns_alert_system = alert_system is None
+        self.alert_system = alert_system or AlertSystem(batch_window=self.config.alert_batch_window,
+                                                        channel_rate_limits=self.config.channel_rate_limits)
         self.frame_count = 0
         self.last_alert_time = 0
         # Placeholder: Initialize tracker and zone config here
         self.tracker = None  # TODO: Integrate DeepSORT or similar
         self.zones = []      # TODO: Define restricted zones for zone-based detection
         
-    def process_frame(self, frame):
-        """Process a single frame through the surveillance pipeline"""
+    def process_frame(self, frame, now: datetime = None):
+        """
+        Process a single frame through the surveillance pipeline
+        Args:
+            frame: Video frame
+            now: Frame time (default: read Config.clock), e.g. the video time during replays
+        """
         self.frame_count += 1
         
+        # Read the clock once; every stage of this frame sees the same time
+        ctx = self.config.time_context(now)
+        
         # Step 1: Detect threats
-        threats, boxes, scores = self.detector.detect(frame)
+        detections = self.detector.detect(frame, camera_id=self.camera_id)
         
         # Step 1b: (Optional) Track objects (placeholder)
         # if self.tracker:
-        #     tracked_objects = self.tracker.update(boxes, threats)
+        #     detections.track_ids[:] = self.tracker.update(detections)
         
         # Step 1c: (Optional) Zone-based detection (placeholder)
-        # for box in boxes:
+        # for box in detections.boxes:
         #     if self._is_in_zone(box):
         #         ...
         
         # Step 2: Blur non-threat faces for privacy
-        processed_frame = self.face_blurrer.blur_faces(frame, threats, boxes)
+        processed_frame = self.face_blurrer.blur_faces(frame, detections)
         
         # Step 3: Draw detection results
-        processed_frame = self.draw_detections(processed_frame, threats, boxes, scores)
+        processed_frame = self.draw_detections(processed_frame, detections, ctx)
         
         # Step 4: Check for alerts
-        self.check_alerts(frame, threats, boxes)
+        self.check_alerts(frame, detections, ctx)
         
         return processed_frame
     
-    def draw_detections(self, frame, threats, boxes, scores):
+    def draw_detections(self, frame, detections, ctx=None):
         """Draw bounding boxes and labels on the frame"""
-        for i, (threat, box, score) in enumerate(zip(threats, boxes, scores)):
+        if ctx is None:
+            ctx = self.config.time_context()
+        after_hours = self.config.is_after_hours(ctx, camera_id=self.camera_id)
+        
+        # Color coding based on threat type, resolved once per frame
+        colors = np.tile(np.array([0, 255, 0], dtype=np.int32), (len(detections), 1))  # Green for other detections
+        colors[detections.mask_for("fire", "smoke")] = (0, 165, 255)  # Orange for fire/smoke
+        if after_hours:
+            colors[detections.mask_for("person")] = (0, 0, 255)  # Red for after-hours intrusion
+        
+        for (threat, box, score), color in zip(detections, colors.tolist()):
             x1, y1, x2, y2 = box
             label = f"{threat}: {score:.2f}"
-            
-            # Color coding based on threat type
-            if threat == "person" and self.config.is_after_hours():
-                color = (0, 0, 255)  # Red for after-hours intrusion
-            elif threat in ["fire", "smoke"]:
-                color = (0, 165, 255)  # Orange for fire/smoke
-            else:
-                color = (0, 255, 0)  # Green for other detections
+            color = tuple(color)
             
             # Draw bounding box
             cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
@@ -77,11 +98,11 @@ class SurveillancePipeline:
             cv2.putText(frame, label, (x1, y1 - 5), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
         
         # Add status overlay
-        self.draw_status_overlay(frame)
+        self.draw_status_overlay(frame, ctx, after_hours)
         
         return frame
     
-    def draw_status_overlay(self, frame):
+    def draw_status_overlay(self, frame, ctx, after_hours):
         """Draw status information overlay"""
         height, width = frame.shape[:2]
         
@@ -94,53 +115,127 @@ class SurveillancePipeline:
         status_text = [
             f"AI Surveillance MVP - Demo Mode",
             f"Frame: {self.frame_count}",
-            f"Time: {datetime.now().strftime('%H:%M:%S')}",
-            f"After Hours: {'ON' if self.config.is_after_hours() else 'OFF'}",
-            f"Threats Detected: {len(self.detector.current_threats)}"
+            f"Time: {ctx.now.strftime('%H:%M:%S')}",
+            f"After Hours: {'ON' if after_hours else 'OFF'}",
+            f"Threats Detected: {len(self.detector.current_detections)}"
         ]
         
         for i, text in enumerate(status_text):
             y_pos = 30 + i * 20
             cv2.putText(frame, text, (20, y_pos), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
     
-    def check_alerts(self, frame, threats, boxes):
+    def check_alerts(self, frame, detections, ctx=None):
         """Check if alerts should be triggered"""
-        current_time = time.time()
+        if ctx is None:
+            ctx = self.config.time_context()
+        current_time = ctx.timestamp
         
         # Prevent spam alerts (minimum 30 seconds between alerts)
         if current_time - self.last_alert_time < 30:
             return
         
         # Check for high-priority threats
-        high_priority_threats = []
-        for threat in threats:
-            if threat in ["fire", "smoke"] or (threat == "person" and self.config.is_after_hours()):
-                high_priority_threats.append(threat)
+        high_priority = detections.mask_for("fire", "smoke")
+        if self.config.is_after_hours(ctx, camera_id=self.camera_id):
+            high_priority |= detections.mask_for("person")
         
-        if high_priority_threats:
-            self.alert_system.send_alert(frame, high_priority_threats, boxes)
+        if high_priority.any():
+            self.alert_system.send_alert(frame, detections.select(high_priority), camera_id=self.camera_id, ctx=ctx)
             self.last_alert_time = current_time
     
-    def run(self, video_source=0):
-        """Main pipeline execution loop"""
+    def _recording_settings(self, detector) -> dict:
+        """Record-time settings that shape the detector output stored in a recording"""
+        return {
+            'camera_id': self.camera_id,
+            'confidence_threshold': detector.confidence_threshold,
+            'class_thresholds': detector.class_thresholds,
+            'roi': self.config.camera_rois.get(self.camera_id),
+            'ignore': self.config.camera_ignore_masks.get(self.camera_id)
+        }
+    
+    def run(self, video_source=0, mode: str = None, show: bool = True,
+            stop_event: threading.Event = None):
+        """
+        Main pipeline execution loop
+        Args:
+            video_source: Camera index, stream URL or video file
+            mode: None for live detection, 'record' to cache detector output,
+                  'replay' to serve cached detections instead of running the model
+            show: Display processed frames (disable for fast headless replays)
+            stop_event: Checked every frame; set it to stop the loop from another thread
+        """
         cap = cv2.VideoCapture(video_source)
         
         if not cap.isOpened():
             print("Error: Could not open video source")
             return
         
+        # Record/replay wrap the detector for this run only
+        detector = self.detector
+        recorder = None
+        video_start = None
+        if mode in ('record', 'replay'):
+            video_hash = video_fingerprint(video_source)
+            settings = self._recording_settings(detector)
+            if mode == 'record':
+                # Key after loading so a demo fallback isn't recorded under the real model's name
+                if not detector.model_loaded:
+                    detector.load_model()
+                model = model_key(detector.model_path, detector.seed, demo=detector.model is None,
+                                  settings=settings)
+                path = recording_path(self.config.recordings_dir, video_hash, model)
+                video_start = self.config.clock()
+                recorder = DetectionRecorder(detector, path, video_hash, model, start_time=video_start.timestamp())
+                self.detector = recorder
+            else:
+                # Without loading the model we can't tell whether it would fall back to demo
+                # mode, so accept either recording, preferring the real model's
+                candidates = [model_key(detector.model_path, detector.seed, demo=demo, settings=settings)
+                              for demo in (False, True)]
+                model = next((key for key in candidates
+                              if os.path.exists(recording_path(self.config.recordings_dir, video_hash, key))),
+                             candidates[0])
+                path = recording_path(self.config.recordings_dir, video_hash, model)
+                if not os.path.exists(path):
+                    print(f"Error: No recording for this video, model and settings ({path})")
+                    recorded = available_models(self.config.recordings_dir, video_hash)
+                    if recorded:
+                        print(f"Recordings exist for: {', '.join(recorded)} "
+                              f"(check --model / --seed, thresholds and camera regions)")
+                    else:
+                        print("Record it first with --record")
+                    cap.release()
+                    return
+                # Replay never loads the model
+                self.detector = ReplayDetector(path, video_hash=video_hash, model=model)
+                video_start = datetime.fromtimestamp(self.detector.start_time)
+            print(f"{mode.capitalize()} mode: {path}")
+        elif not detector.model_loaded:
+            detector.load_model()
+        
+        # Recorded and replayed video files follow video time anchored at the recording start,
+        # so schedule and alert decisions don't depend on when the replay runs
+        if video_start is not None and not (isinstance(video_source, str) and os.path.isfile(video_source)):
+            video_start = None
+        
         print("AI Surveillance MVP Started")
         print("Press 'q' to quit, 'a' to toggle after-hours mode")
         
         try:
-            while True:
+            while stop_event is None or not stop_event.is_set():
                 ret, frame = cap.read()
                 if not ret:
                     print("End of video stream")
                     break
                 
                 # Process frame through pipeline
-                processed_frame = self.process_frame(frame)
+                frame_time = None
+                if video_start is not None:
+                    frame_time = video_start + timedelta(milliseconds=cap.get(cv2.CAP_PROP_POS_MSEC))
+                processed_frame = self.process_frame(frame, frame_time)
+                
+                if not show:
+                    continue
                 
                 # Display result
                 cv2.imshow('AI Surveillance MVP - Demo', processed_frame)
@@ -158,23 +253,86 @@ class SurveillancePipeline:
         
         finally:
             cap.release()
-            cv2.destroyAllWindows()
+            if show:
+                cv2.destroyAllWindows()
+            if recorder is not None:
+                recorder.save()
+            self.detector = detector
+            if self.owns_alert_system:
+                self.alert_system.close()
             print("Surveillance pipeline stopped")
 
+def run_cameras(sources, model_path: str = 'yolov8m.pt', seed: int = None, mode: str = None):
+    """
+    Run one pipeline per camera, all feeding a shared AlertSystem so alerts
+    raised by different cameras within the batching window go out as one digest.
+    Cameras run headless in their own threads; Ctrl-C stops them all cleanly
+    (captures released, recordings saved) before the shared AlertSystem is closed.
+    """
+    config = Config()
+    alert_system = AlertSystem(batch_window=config.alert_batch_window,
+                               channel_rate_limits=config.channel_rate_limits)
+    
+    stop_event = threading.Event()
+    threads = []
+    for camera_id, source in enumerate(sources, start=1):
+        source = int(source) if source.isdigit() else source
+        pipeline = SurveillancePipeline(model_path=model_path, seed=seed, camera_id=camera_id,
+                                        alert_system=alert_system)
+        thread = threading.Thread(target=pipeline.run, args=(source,),
+                                  kwargs={'mode': mode, 'show': False, 'stop_event': stop_event})
+        thread.start()
+        threads.append(thread)
+    
+    try:
+        # Join with a timeout so Ctrl-C reaches the main thread promptly
+        while any(thread.is_alive() for thread in threads):
+            for thread in threads:
+                thread.join(timeout=0.5)
+    except KeyboardInterrupt:
+        print("\nStopping surveillance pipelines...")
+        stop_event.set()
+        for thread in threads:
+            thread.join()
+    finally:
+        alert_system.close()
+
 def main():
     """Entry point for the surveillance system"""
-    pipeline = SurveillancePipeline()
+    parser = argparse.ArgumentParser(description="AI Surveillance MVP")
+    parser.add_argument("--source", nargs="+", help="Video files, stream URLs or camera indexes (one per camera)")
+    parser.add_argument("--model", default="yolov8m.pt", help="YOLOv8 model path")
+    replay_mode = parser.add_mutually_exclusive_group()
+    replay_mode.add_argument("--record", action="store_true", help="Cache detector output for later replay")
+    replay_mode.add_argument("--replay", action="store_true", help="Replay cached detector output instead of running the model")
+    parser.add_argument("--seed", type=int, help="Seed for deterministic demo detections")
+    parser.add_argument("--no-display", action="store_true", help="Process without opening a window")
+    args = parser.parse_args()
+    
+    mode = "record" if args.record else "replay" if args.replay else None
+    
+    if args.source is not None and len(args.source) > 1:
+        run_cameras(args.source, model_path=args.model, seed=args.seed, mode=mode)
+        return
+    
+    pipeline = SurveillancePipeline(model_path=args.model, seed=args.seed)
+    
+    if args.source is not None:
+        source = args.source[0]
+        source = int(source) if source.isdigit() else source
+        pipeline.run(source, mode=mode, show=not args.no_display)
+        return
     
     # Check for mobile camera configuration
     try:
         import mobile_camera_config
         print(f"📱 Using mobile camera: {mobile_camera_config.CAMERA_URL}")
-        pipeline.run(mobile_camera_config.CAMERA_URL)
+        pipeline.run(mobile_camera_config.CAMERA_URL, mode=mode, show=not args.no_display)
     except ImportError:
         # For demo: use webcam (0) or specify video file path
         # Example: pipeline.run("demo_video.mp4")
         print("📹 Using webcam (press 'm' for mobile camera setup)")
-        pipeline.run(0)
+        pipeline.run(0, mode=mode, show=not args.no_display)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
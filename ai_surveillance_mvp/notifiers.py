@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+"""
+Notifier Channels Module
+Pluggable alert delivery channels (Twilio, SMTP, webhook, file, syslog)
+with per-channel rate limits and connection reuse
+"""
+
+import os
+import json
+import time
+import smtplib
+import logging
+import logging.handlers
+import mimetypes
+import threading
+import http.client
+from email.message import EmailMessage
+from urllib.parse import urlsplit
+from typing import List, Optional
+
+# Outcomes of Notifier.notify
+DELIVERED = "delivered"
+FAILED = "failed"
+RATE_LIMITED = "rate_limited"
+
+
+class RateLimiter:
+    """Token bucket limiting how many messages a channel may send per minute"""
+
+    def __init__(self, max_per_minute: Optional[float] = None, burst: Optional[int] = None):
+        """
+        Args:
+            max_per_minute: Sustained message rate (None disables limiting)
+            burst: Bucket size, defaults to one minute worth of messages
+        """
+        self.max_per_minute = max_per_minute
+        self.capacity = burst if burst is not None else max(1, int(max_per_minute or 1))
+        self.tokens = float(self.capacity)
+        self.last_refill = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> bool:
+        """Take one token if available"""
+        if not self.max_per_minute:
+            return True
+
+        with self.lock:
+            now = time.monotonic()
+            elapsed = now - self.last_refill
+            self.last_refill = now
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.max_per_minute / 60.0)
+
+            if self.tokens < 1.0:
+                return False
+            self.tokens -= 1.0
+            return True
+
+    def wait_time(self) -> float:
+        """Seconds until the next token becomes available"""
+        if not self.max_per_minute:
+            return 0.0
+
+        with self.lock:
+            elapsed = time.monotonic() - self.last_refill
+            tokens = min(self.capacity, self.tokens + elapsed * self.max_per_minute / 60.0)
+            return max(0.0, (1.0 - tokens) * 60.0 / self.max_per_minute)
+
+
+class Notifier:
+    """Base class for alert channels"""
+
+    name = "notifier"
+
+    def __init__(self, max_per_minute: Optional[float] = None):
+        self.rate_limiter = RateLimiter(max_per_minute)
+        self.lock = threading.Lock()
+
+    def notify(self, message: str, snapshot_paths: List[str], alerts: Optional[List[dict]] = None) -> str:
+        """
+        Deliver a message through this channel
+        Args:
+            message: Alert or digest text
+            snapshot_paths: Snapshot images belonging to the message
+            alerts: Structured alert records (used by machine-readable channels)
+        Returns:
+            DELIVERED, FAILED, or RATE_LIMITED if the channel is out of tokens
+            (the caller should retry later)
+        """
+        if not self.rate_limiter.acquire():
+            print(f"[{self.name}] rate limit reached - message deferred")
+            return RATE_LIMITED
+
+        try:
+            with self.lock:
+                self._send(message, snapshot_paths, alerts or [])
+            return DELIVERED
+        except Exception as e:
+            print(f"Error sending {self.name} alert: {e}")
+            return FAILED
+
+    def _send(self, message: str, snapshot_paths: List[str], alerts: List[dict]):
+        raise NotImplementedError
+
+    def close(self):
+        """Release any open connection"""
+        pass
+
+
+class DemoNotifier(Notifier):
+    """Demo channel - simulates sending notification on the console"""
+
+    name = "demo"
+
+    def _send(self, message: str, snapshot_paths: List[str], alerts: List[dict]):
+        print("\n" + "="*50)
+        print("📱 DEMO ALERT SIMULATION")
+        print("="*50)
+        print(f"To: +1234567890")
+        print(f"From: +1987654321")
+        print(f"Message: {message}")
+        print(f"Snapshot: {', '.join(snapshot_paths)}")
+        print("="*50)
+        print("In production, this would be sent via Twilio SMS/WhatsApp")
+        print("="*50 + "\n")
+
+
+class TwilioNotifier(Notifier):
+    """Twilio SMS/WhatsApp channel, with MMS when snapshots are publicly served"""
+
+    name = "twilio"
+
+    def __init__(self, client, from_number: str, to_number: str,
+                 media_base_url: Optional[str] = None, max_per_minute: Optional[float] = None):
+        """
+        Args:
+            client: Twilio REST client (reused for every message)
+            from_number: Sender number
+            to_number: Recipient number
+            media_base_url: Public URL under which the snapshots directory is served;
+                            when set, snapshots are attached as MMS media
+        """
+        super().__init__(max_per_minute)
+        self.client = client
+        self.from_number = from_number
+        self.to_number = to_number
+        self.media_base_url = media_base_url.rstrip('/') if media_base_url else None
+
+    @classmethod
+    def from_env(cls, max_per_minute: Optional[float] = None) -> Optional['TwilioNotifier']:
+        """Build the channel from TWILIO_* environment variables"""
+        try:
+            from twilio.rest import Client
+
+            # These would be set as environment variables in production
+            # PLACEHOLDER: Insert your Twilio credentials here or set as environment variables
+            account_sid = os.getenv('TWILIO_ACCOUNT_SID', 'YOUR_TWILIO_ACCOUNT_SID')  # PLACEHOLDER
+            auth_token = os.getenv('TWILIO_AUTH_TOKEN', 'YOUR_TWILIO_AUTH_TOKEN')    # PLACEHOLDER
+            from_number = os.getenv('TWILIO_FROM_NUMBER', '+1234567890')             # PLACEHOLDER
+            to_number = os.getenv('TWILIO_TO_NUMBER', '+0987654321')                 # PLACEHOLDER
+
+            if all([account_sid, auth_token, from_number, to_number]):
+                notifier = cls(Client(account_sid, auth_token), from_number, to_number,
+                               media_base_url=os.getenv('TWILIO_MEDIA_BASE_URL'),
+                               max_per_minute=max_per_minute)
+                print("Twilio client initialized successfully!")
+                return notifier
+
+            print("Twilio credentials not found - skipping Twilio channel")
+            print("Set environment variables: TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN, etc.")
+
+        except ImportError:
+            print("Twilio not installed - skipping Twilio channel")
+            print("Install with: pip install twilio")
+        except Exception as e:
+            print(f"Error initializing Twilio: {e}")
+        return None
+
+    def _send(self, message: str, snapshot_paths: List[str], alerts: List[dict]):
+        kwargs = {'body': message, 'from_': self.from_number, 'to': self.to_number}
+        if self.media_base_url and snapshot_paths:
+            # Twilio accepts at most 10 media URLs per message
+            kwargs['media_url'] = [
+                f"{self.media_base_url}/{os.path.basename(path)}" for path in snapshot_paths[:10]
+            ]
+        self.client.messages.create(**kwargs)
+
+
+class SMTPNotifier(Notifier):
+    """Email channel keeping one SMTP session open between messages"""
+
+    name = "smtp"
+
+    def __init__(self, host: str, port: int, from_addr: str, to_addrs: List[str],
+                 username: Optional[str] = None, password: Optional[str] = None,
+                 starttls: bool = False, timeout: float = 10.0,
+                 max_per_minute: Optional[float] = None):
+        super().__init__(max_per_minute)
+        self.host = host
+        self.port = port
+        self.from_addr = from_addr
+        self.to_addrs = to_addrs
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+        self.connection = None
+
+    @classmethod
+    def from_env(cls, max_per_minute: Optional[float] = None) -> Optional['SMTPNotifier']:
+        """Build the channel from ALERT_SMTP_* environment variables"""
+        host = os.getenv('ALERT_SMTP_HOST')
+        to_addrs = os.getenv('ALERT_SMTP_TO')
+        if not host or not to_addrs:
+            return None
+        return cls(
+            host=host,
+            port=int(os.getenv('ALERT_SMTP_PORT', '25')),
+            from_addr=os.getenv('ALERT_SMTP_FROM', 'surveillance@localhost'),
+            to_addrs=[addr.strip() for addr in to_addrs.split(',') if addr.strip()],
+            username=os.getenv('ALERT_SMTP_USER'),
+            password=os.getenv('ALERT_SMTP_PASSWORD'),
+            starttls=os.getenv('ALERT_SMTP_STARTTLS', '0') == '1',
+            max_per_minute=max_per_minute
+        )
+
+    def _connect(self) -> smtplib.SMTP:
+        """Return the open session, reconnecting if the server dropped it"""
+        if self.connection is not None:
+            try:
+                if self.connection.noop()[0] == 250:
+                    return self.connection
+            except smtplib.SMTPException:
+                pass
+            except OSError:
+                pass
+            self.close()
+
+        connection = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.starttls:
+            connection.starttls()
+        if self.username:
+            connection.login(self.username, self.password or '')
+        self.connection = connection
+        return connection
+
+    def _send(self, message: str, snapshot_paths: List[str], alerts: List[dict]):
+        email = EmailMessage()
+        email['Subject'] = message.splitlines()[0] if message else "Security Alert"
+        email['From'] = self.from_addr
+        email['To'] = ", ".join(self.to_addrs)
+        email.set_content(message)
+
+        for path in snapshot_paths:
+            if not os.path.exists(path):
+                continue
+            mime_type, _ = mimetypes.guess_type(path)
+            maintype, subtype = (mime_type or 'application/octet-stream').split('/', 1)
+            with open(path, 'rb') as f:
+                email.add_attachment(f.read(), maintype=maintype, subtype=subtype,
+                                     filename=os.path.basename(path))
+
+        self._connect().send_message(email)
+
+    def close(self):
+        if self.connection is not None:
+            try:
+                self.connection.quit()
+            except Exception:
+                pass
+            self.connection = None
+
+
+class WebhookNotifier(Notifier):
+    """HTTP POST channel sending JSON over a persistent keep-alive connection"""
+
+    name = "webhook"
+
+    def __init__(self, url: str, timeout: float = 10.0, max_per_minute: Optional[float] = None):
+        super().__init__(max_per_minute)
+        parts = urlsplit(url)
+        self.url = url
+        self.scheme = parts.scheme or 'http'
+        self.host = parts.hostname
+        self.port = parts.port
+        self.path = parts.path or '/'
+        if parts.query:
+            self.path += '?' + parts.query
+        self.timeout = timeout
+        self.connection = None
+
+    @classmethod
+    def from_env(cls, max_per_minute: Optional[float] = None) -> Optional['WebhookNotifier']:
+        """Build the channel from the ALERT_WEBHOOK_URL environment variable"""
+        url = os.getenv('ALERT_WEBHOOK_URL')
+        return cls(url, max_per_minute=max_per_minute) if url else None
+
+    def _connect(self) -> http.client.HTTPConnection:
+        if self.connection is None:
+            if self.scheme == 'https':
+                self.connection = http.client.HTTPSConnection(self.host, self.port, timeout=self.timeout)
+            else:
+                self.connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        return self.connection
+
+    def _send(self, message: str, snapshot_paths: List[str], alerts: List[dict]):
+        body = json.dumps({
+            'message': message,
+            'snapshots': snapshot_paths,
+            'alerts': alerts
+        }).encode('utf-8')
+        headers = {'Content-Type': 'application/json', 'Connection': 'keep-alive'}
+
+        # Retry once on a fresh connection if the server closed the idle one
+        for attempt in range(2):
+            connection = self._connect()
+            try:
+                connection.request('POST', self.path, body=body, headers=headers)
+                response = connection.getresponse()
+                response.read()
+                break
+            except (http.client.HTTPException, OSError):
+                self.close()
+                if attempt == 1:
+                    raise
+
+        if response.will_close:
+            self.close()
+        if response.status >= 400:
+            raise RuntimeError(f"webhook returned HTTP {response.status}")
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+
+class FileNotifier(Notifier):
+    """Local channel appending alerts to a log file or forwarding them to syslog"""
+
+    name = "file"
+
+    def __init__(self, path: Optional[str] = None, syslog_address=None,
+                 max_per_minute: Optional[float] = None):
+        """
+        Args:
+            path: Log file to append alerts to
+            syslog_address: Syslog socket path or (host, port) tuple
+        """
+        super().__init__(max_per_minute)
+        self.logger = logging.getLogger(f"surveillance.alerts.{id(self)}")
+        self.logger.setLevel(logging.WARNING)
+        self.logger.propagate = False
+
+        if path:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            handler = logging.FileHandler(path)
+            handler.setFormatter(logging.Formatter('%(asctime)s %(message)s'))
+            self.logger.addHandler(handler)
+            self.name = "file"
+        if syslog_address:
+            handler = logging.handlers.SysLogHandler(address=syslog_address)
+            handler.setFormatter(logging.Formatter('surveillance: %(message)s'))
+            self.logger.addHandler(handler)
+            self.name = "syslog" if not path else "file+syslog"
+
+    @classmethod
+    def from_env(cls, max_per_minute: Optional[float] = None) -> Optional['FileNotifier']:
+        """Build the channel from ALERT_LOG_FILE / ALERT_SYSLOG_ADDRESS environment variables"""
+        path = os.getenv('ALERT_LOG_FILE')
+        syslog_address = os.getenv('ALERT_SYSLOG_ADDRESS')
+        if not path and not syslog_address:
+            return None
+
+        if syslog_address and ':' in syslog_address:
+            host, port = syslog_address.rsplit(':', 1)
+            syslog_address = (host, int(port))
+        return cls(path=path, syslog_address=syslog_address, max_per_minute=max_per_minute)
+
+    def _send(self, message: str, snapshot_paths: List[str], alerts: List[dict]):
+        line = message.replace("\n", " | ")
+        if snapshot_paths:
+            line += f" | snapshots: {', '.join(snapshot_paths)}"
+        self.logger.warning(line)
+
+    def close(self):
+        for handler in list(self.logger.handlers):
+            handler.close()
+            self.logger.removeHandler(handler)
+
+
+def create_notifiers_from_env(rate_limits: Optional[dict] = None) -> List[Notifier]:
+    """
+    Build every channel whose environment variables are set
+    Args:
+        rate_limits: Optional per-channel messages-per-minute limits, keyed by channel name
+    """
+    rate_limits = rate_limits or {}
+    notifiers = [
+        TwilioNotifier.from_env(rate_limits.get('twilio')),
+        SMTPNotifier.from_env(rate_limits.get('smtp')),
+        WebhookNotifier.from_env(rate_limits.get('webhook')),
+        FileNotifier.from_env(rate_limits.get('file')),
+    ]
+    return [notifier for notifier in notifiers if notifier is not None]
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Camera Regions Module
+Per-camera inference ROIs and static ignore masks
+"""
+
+import cv2
+import numpy as np
+from typing import List, Optional, Sequence, Tuple
+from detections import DetectionBatch
+
+Polygon = Sequence[Tuple[int, int]]
+
+
+class CameraRegions:
+    def __init__(self, roi: Optional[Sequence] = None, ignore: Optional[List[Polygon]] = None):
+        """
+        Args:
+            roi: Inference region - an (x1, y1, x2, y2) rectangle or a list of polygons.
+                 Frames are cropped to its bounding rectangle before inference.
+            ignore: Polygons (DVR timestamps, sky, walls) where detections are dropped
+        """
+        self.roi_polygons = self._as_polygons(roi) if roi else []
+        self.ignore_polygons = [np.asarray(p, dtype=np.int32).reshape(-1, 2) for p in (ignore or [])]
+
+        # Compiled lazily for the first frame size seen
+        self.frame_shape = None
+        self.crop_rect = None
+        self.valid_mask = None
+
+    @staticmethod
+    def _as_polygons(roi: Sequence) -> List[np.ndarray]:
+        """Normalize a rectangle or polygon list into polygon arrays"""
+        if len(roi) == 4 and all(np.isscalar(v) for v in roi):
+            x1, y1, x2, y2 = roi
+            roi = [[(x1, y1), (x2, y1), (x2, y2), (x1, y2)]]
+        return [np.asarray(p, dtype=np.int32).reshape(-1, 2) for p in roi]
+
+    def _compile(self, frame_shape: Tuple[int, int]):
+        """Rasterize ROI and ignore polygons into one validity mask for this frame size"""
+        height, width = frame_shape
+
+        if self.roi_polygons:
+            valid = np.zeros((height, width), dtype=np.uint8)
+            cv2.fillPoly(valid, self.roi_polygons, 1)
+        else:
+            valid = np.ones((height, width), dtype=np.uint8)
+        if self.ignore_polygons:
+            cv2.fillPoly(valid, self.ignore_polygons, 0)
+
+        # Crop to the bounding rectangle of everything still valid
+        ys, xs = np.nonzero(valid.any(axis=1))[0], np.nonzero(valid.any(axis=0))[0]
+        if len(xs) == 0:
+            self.crop_rect = None
+        else:
+            self.crop_rect = (int(xs[0]), int(ys[0]), int(xs[-1]) + 1, int(ys[-1]) + 1)
+
+        self.valid_mask = valid.astype(bool)
+        self.frame_shape = frame_shape
+
+    def crop(self, frame: np.ndarray) -> Tuple[Optional[np.ndarray], Tuple[int, int]]:
+        """
+        Crop the frame to the inference region
+        Returns:
+            (cropped view or None if nothing is valid, (x_offset, y_offset))
+        """
+        if self.frame_shape != frame.shape[:2]:
+            self._compile(frame.shape[:2])
+
+        if self.crop_rect is None:
+            return None, (0, 0)
+        x1, y1, x2, y2 = self.crop_rect
+        return frame[y1:y2, x1:x2], (x1, y1)
+
+    def filter(self, detections: DetectionBatch) -> DetectionBatch:
+        """Drop detections whose box center lies outside the ROI or inside an ignore mask"""
+        if len(detections) == 0 or self.valid_mask is None:
+            return detections
+
+        height, width = self.valid_mask.shape
+        boxes = detections.boxes
+        cx = np.clip(((boxes[:, 0] + boxes[:, 2]) * 0.5).astype(np.int32), 0, width - 1)
+        cy = np.clip(((boxes[:, 1] + boxes[:, 3]) * 0.5).astype(np.int32), 0, height - 1)
+        keep = self.valid_mask[cy, cx]
+
+        if keep.all():
+            return detections
+        return detections.select(keep)
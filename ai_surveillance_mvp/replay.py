@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Record & Replay Module
+Caches detector outputs per video frame so the rest of the pipeline
+can be re-run deterministically without running inference
+"""
+
+import os
+import json
+import hashlib
+import numpy as np
+from typing import List, Optional
+from detections import DetectionBatch, DETECTION_DTYPE, CLASS_TABLE
+
+RECORDING_VERSION = 2
+
+
+def video_fingerprint(video_source) -> str:
+    """Hash a video file's contents (live sources are keyed by their name)"""
+    if isinstance(video_source, str) and os.path.isfile(video_source):
+        digest = hashlib.sha1()
+        with open(video_source, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        return digest.hexdigest()[:16]
+    return hashlib.sha1(str(video_source).encode('utf-8')).hexdigest()[:16]
+
+
+def weights_fingerprint(model_path: str) -> str:
+    """Hash the weights file's contents, or its resolved path if it doesn't exist (yet)"""
+    if os.path.isfile(model_path):
+        digest = hashlib.sha1()
+        with open(model_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        return digest.hexdigest()[:8]
+    return hashlib.sha1(os.path.abspath(model_path).encode('utf-8')).hexdigest()[:8]
+
+
+def settings_fingerprint(settings: dict) -> str:
+    """Hash the detection settings a recording was filtered with (thresholds, ROI, masks)"""
+    encoded = json.dumps(settings, sort_keys=True, default=str)
+    return hashlib.sha1(encoded.encode('utf-8')).hexdigest()[:8]
+
+
+def model_key(model_path: str, seed: Optional[int] = None, demo: bool = False,
+              settings: Optional[dict] = None) -> str:
+    """
+    Identify what produced a recording
+    Args:
+        model_path: YOLOv8 weights path (file contents are hashed, so same-named weights differ)
+        seed: Demo detection seed
+        demo: True when the detector fell back to demo mode
+        settings: Record-time detection settings; replay serves already-filtered output,
+                  so different thresholds or regions need a different recording
+    """
+    key = f"{os.path.splitext(os.path.basename(model_path))[0]}-{weights_fingerprint(model_path)}"
+    if demo:
+        key += "-demo"
+    if seed is not None:
+        key += f"-seed{seed}"
+    if settings:
+        key += f"-{settings_fingerprint(settings)}"
+    return key
+
+
+def recording_path(recordings_dir: str, video_hash: str, model: str) -> str:
+    """Cache file location for a (video, model) pair"""
+    return os.path.join(recordings_dir, f"{video_hash}_{model}.npz")
+
+
+def available_models(recordings_dir: str, video_hash: str) -> List[str]:
+    """Model keys that have a recording for this video"""
+    if not os.path.isdir(recordings_dir):
+        return []
+    prefix = f"{video_hash}_"
+    return sorted(name[len(prefix):-len(".npz")] for name in os.listdir(recordings_dir)
+                  if name.startswith(prefix) and name.endswith(".npz"))
+
+
+class DetectionRecorder:
+    """Wraps a detector and stores its output for every frame"""
+
+    def __init__(self, detector, path: str, video_hash: str, model: str, start_time: float = 0.0):
+        """
+        Args:
+            detector: Detector whose output is recorded
+            path: Recording file to write
+            video_hash: Fingerprint of the input video
+            model: Model key (see model_key)
+            start_time: Timestamp the video's frame times are anchored at during replay
+        """
+        self.detector = detector
+        self.path = path
+        self.video_hash = video_hash
+        self.model = model
+        self.start_time = start_time
+        self.frames = []
+        self.current_detections = DetectionBatch()
+
+    def detect(self, frame: np.ndarray, camera_id: int = 1) -> DetectionBatch:
+        detections = self.detector.detect(frame, camera_id)
+        self.frames.append(detections.records.copy())
+        self.current_detections = detections
+        return detections
+
+    def get_threat_summary(self) -> dict:
+        return self.current_detections.counts()
+
+    def save(self):
+        """Write all frames to one compressed file: concatenated records plus per-frame offsets"""
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        lengths = np.array([len(records) for records in self.frames], dtype=np.int64)
+        offsets = np.concatenate([[0], np.cumsum(lengths)])
+        records = np.concatenate(self.frames) if self.frames else np.empty(0, dtype=DETECTION_DTYPE)
+
+        np.savez_compressed(
+            self.path,
+            version=np.array(RECORDING_VERSION),
+            video_hash=np.array(self.video_hash),
+            model=np.array(self.model),
+            start_time=np.array(self.start_time),
+            class_names=np.array(CLASS_TABLE.names),
+            offsets=offsets,
+            records=records
+        )
+        print(f"Recorded {len(self.frames)} frames to {self.path}")
+
+
+class ReplayDetector:
+    """Serves recorded detections frame by frame instead of running a model"""
+
+    def __init__(self, path: str, video_hash: Optional[str] = None, model: Optional[str] = None):
+        """
+        Args:
+            path: Recording written by DetectionRecorder
+            video_hash: Expected video fingerprint (checked if given)
+            model: Expected model key (checked if given)
+        """
+        with np.load(path) as data:
+            if int(data['version']) != RECORDING_VERSION:
+                raise ValueError(f"Unsupported recording version in {path}")
+            self.video_hash = str(data['video_hash'])
+            self.model_name = str(data['model'])
+            self.start_time = float(data['start_time'])
+            class_names = [str(name) for name in data['class_names']]
+            self.offsets = data['offsets']
+            self.records = data['records']
+
+        if video_hash is not None and video_hash != self.video_hash:
+            raise ValueError(f"Recording {path} was made from a different video")
+        if model is not None and model != self.model_name:
+            raise ValueError(f"Recording {path} was made with model {self.model_name}, not {model}")
+
+        # Remap recorded class ids onto this process's class table
+        lookup = np.array([CLASS_TABLE.intern(name) for name in class_names], dtype=np.int16)
+        if len(self.records):
+            self.records['class_id'] = lookup[self.records['class_id']]
+
+        self.model = None
+        self.frame_index = 0
+        self.current_detections = DetectionBatch()
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def detections_for(self, frame_index: int) -> DetectionBatch:
+        """Recorded detections of one frame (empty past the end of the recording)"""
+        if frame_index >= len(self):
+            return DetectionBatch()
+        start, end = self.offsets[frame_index], self.offsets[frame_index + 1]
+        return DetectionBatch(self.records[start:end].copy())
+
+    def detect(self, frame: np.ndarray, camera_id: int = 1) -> DetectionBatch:
+        detections = self.detections_for(self.frame_index)
+        self.frame_index += 1
+        self.current_detections = detections
+        return detections
+
+    def get_threat_summary(self) -> dict:
+        return self.current_detections.counts()
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Schedule Module
+Weekly after-hours calendars with holidays and per-camera / per-zone overrides,
+compiled into transition tables and evaluated once per frame
+"""
+
+import bisect
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+WEEK_SECONDS = 7 * 86400
+EVERY_DAY = (0, 1, 2, 3, 4, 5, 6)  # Monday = 0
+
+TimeSpec = Union[int, str, time]
+
+
+def _seconds_of_day(spec: TimeSpec) -> int:
+    """Parse an hour (22), "HH:MM" string or time object into seconds after midnight"""
+    if isinstance(spec, time):
+        return spec.hour * 3600 + spec.minute * 60 + spec.second
+    if isinstance(spec, str):
+        hour, _, minute = spec.partition(':')
+        return int(hour) * 3600 + int(minute or 0) * 60
+    return int(spec) * 3600
+
+
+class Schedule:
+    def __init__(self, windows: Iterable[Tuple[Iterable[int], TimeSpec, TimeSpec]] = (),
+                 holidays: Iterable[date] = ()):
+        """
+        Args:
+            windows: (weekdays, start, end) restricted windows; end <= start wraps past midnight
+            holidays: Dates that are restricted all day
+        """
+        self.windows = [(tuple(days), start, end) for days, start, end in windows]
+        self.holidays = frozenset(holidays)
+        self.edges, self.states = self._compile()
+
+        # Cached answer and the span of time it stays valid for
+        self._valid_from = None
+        self._valid_until = None
+        self._active = False
+
+    @classmethod
+    def daily(cls, start: TimeSpec, end: TimeSpec, holidays: Iterable[date] = ()) -> 'Schedule':
+        """Same restricted window every day of the week (start == end restricts whole days)"""
+        return cls([(EVERY_DAY, start, end)], holidays)
+
+    def _compile(self) -> Tuple[List[int], List[bool]]:
+        """Flatten windows into sorted seconds-of-week transition points"""
+        intervals = []
+        for days, start, end in self.windows:
+            start_s, end_s = _seconds_of_day(start), _seconds_of_day(end)
+            length = end_s - start_s if end_s > start_s else 86400 - start_s + end_s
+            for day in days:
+                begin = day * 86400 + start_s
+                finish = begin + length
+                if finish <= WEEK_SECONDS:
+                    intervals.append((begin, finish))
+                else:
+                    # Sunday night window wraps into Monday morning
+                    intervals.append((begin, WEEK_SECONDS))
+                    intervals.append((0, finish - WEEK_SECONDS))
+
+        # Merge overlapping windows
+        merged = []
+        for begin, finish in sorted(intervals):
+            if merged and begin <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], finish)
+            else:
+                merged.append([begin, finish])
+
+        edges, states = [0], [False]
+        for begin, finish in merged:
+            if begin == edges[-1]:
+                states[-1] = True
+            else:
+                edges.append(begin)
+                states.append(True)
+            if finish < WEEK_SECONDS:
+                edges.append(finish)
+                states.append(False)
+        return edges, states
+
+    def is_active(self, now: datetime) -> bool:
+        """Check whether the schedule is restricted at a given moment"""
+        if self._valid_from is not None and self._valid_from <= now < self._valid_until:
+            return self._active
+
+        midnight = datetime.combine(now.date(), time(0))
+        next_midnight = midnight + timedelta(days=1)
+
+        if now.date() in self.holidays:
+            active, valid_from, valid_until = True, midnight, next_midnight
+        else:
+            week_start = midnight - timedelta(days=now.weekday())
+            offset = (now - week_start).total_seconds()
+            index = bisect.bisect_right(self.edges, offset) - 1
+            next_edge = self.edges[index + 1] if index + 1 < len(self.edges) else WEEK_SECONDS
+
+            active = self.states[index]
+            valid_from = week_start + timedelta(seconds=self.edges[index])
+            valid_until = week_start + timedelta(seconds=next_edge)
+
+            # A holiday can start at any midnight, so never cache across one
+            if self.holidays:
+                valid_from = max(valid_from, midnight)
+                valid_until = min(valid_until, next_midnight)
+
+        self._active = active
+        self._valid_from = valid_from
+        self._valid_until = valid_until
+        return active
+
+    def describe(self) -> str:
+        """Human readable summary for status output"""
+        day_names = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+        parts = []
+        for days, start, end in self.windows:
+            start_s, end_s = _seconds_of_day(start), _seconds_of_day(end)
+            label = "daily" if tuple(sorted(days)) == EVERY_DAY else ",".join(day_names[d] for d in days)
+            parts.append(f"{start_s // 3600}:{start_s % 3600 // 60:02d} - "
+                         f"{end_s // 3600}:{end_s % 3600 // 60:02d} ({label})")
+        if self.holidays:
+            parts.append(f"{len(self.holidays)} holiday(s)")
+        return "; ".join(parts) or "never"
+
+
+class ScheduleEngine:
+    def __init__(self, default: Schedule, camera_schedules: Optional[Dict[int, Schedule]] = None,
+                 zone_schedules: Optional[Dict[str, Schedule]] = None):
+        """
+        Args:
+            default: Schedule used when no camera or zone override exists
+            camera_schedules: Camera id -> schedule override
+            zone_schedules: Zone name -> schedule override (takes precedence over camera)
+        """
+        self.default = default
+        self.camera_schedules = camera_schedules or {}
+        self.zone_schedules = zone_schedules or {}
+
+    def schedule_for(self, camera_id: Optional[int] = None, zone: Optional[str] = None) -> Schedule:
+        if zone is not None and zone in self.zone_schedules:
+            return self.zone_schedules[zone]
+        if camera_id is not None and camera_id in self.camera_schedules:
+            return self.camera_schedules[camera_id]
+        return self.default
+
+    def is_active(self, now: datetime, camera_id: Optional[int] = None, zone: Optional[str] = None) -> bool:
+        return self.schedule_for(camera_id, zone).is_active(now)
+
+
+class TimeContext:
+    """One clock reading shared by every stage of a frame"""
+
+    __slots__ = ('now', 'timestamp', 'engine', '_after_hours')
+
+    def __init__(self, now: datetime, engine: ScheduleEngine):
+        self.now = now
+        self.timestamp = now.timestamp()
+        self.engine = engine
+        self._after_hours = {}
+
+    def is_after_hours(self, camera_id: Optional[int] = None, zone: Optional[str] = None) -> bool:
+        """Schedule lookup memoized for the lifetime of the frame"""
+        key = (camera_id, zone)
+        result = self._after_hours.get(key)
+        if result is None:
+            result = self.engine.is_active(self.now, camera_id, zone)
+            self._after_hours[key] = result
+        return result
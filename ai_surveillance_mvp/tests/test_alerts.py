@@ -0,0 +1,187 @@
+"""
+Alert batching and notifier channels, exercised against localhost stand-in servers
+"""
+
+import json
+import socketserver
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import numpy as np
+import pytest
+
+from alert import AlertSystem
+from detections import DetectionBatch
+from notifiers import (Notifier, SMTPNotifier, WebhookNotifier,
+                       DELIVERED, RATE_LIMITED)
+
+
+class RecordingNotifier(Notifier):
+    """In-memory channel that keeps every message it is asked to send"""
+
+    name = "recording"
+
+    def __init__(self, max_per_minute=None):
+        super().__init__(max_per_minute)
+        self.sent = []
+
+    def _send(self, message, snapshot_paths, alerts):
+        self.sent.append((message, snapshot_paths, [alert['camera_id'] for alert in alerts]))
+
+
+class SMTPStubHandler(socketserver.StreamRequestHandler):
+    """Just enough SMTP for smtplib: greets, accepts every command and stores DATA"""
+
+    def reply(self, line):
+        self.wfile.write(line.encode('ascii') + b"\r\n")
+
+    def handle(self):
+        self.server.connections += 1
+        self.reply("220 localhost stub")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode('ascii', 'replace').strip().upper()
+            if command.startswith("EHLO"):
+                self.reply("250-localhost")
+                self.reply("250 8BITMIME")
+            elif command == "DATA":
+                self.reply("354 end with .")
+                data = []
+                while True:
+                    chunk = self.rfile.readline()
+                    if chunk in (b".\r\n", b""):
+                        break
+                    data.append(chunk)
+                self.server.messages.append(b"".join(data))
+                self.reply("250 queued")
+            elif command == "QUIT":
+                self.reply("221 bye")
+                return
+            else:
+                self.reply("250 ok")
+
+
+class WebhookHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        self.server.requests.append((self.client_address, json.loads(body)))
+        self.send_response(200)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def smtp_server():
+    server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), SMTPStubHandler)
+    server.daemon_threads = True
+    server.connections = 0
+    server.messages = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def webhook_server():
+    server = HTTPServer(('127.0.0.1', 0), WebhookHandler)
+    server.requests = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(autouse=True)
+def in_tmp_dir(tmp_path, monkeypatch):
+    # Snapshots are written relative to the working directory
+    monkeypatch.chdir(tmp_path)
+
+
+def fire(camera_id=1):
+    return DetectionBatch.from_lists(['fire'], [(1, 1, 10, 10)], [0.9], camera_id)
+
+
+FRAME = np.zeros((32, 32, 3), dtype=np.uint8)
+
+
+def test_alerts_from_several_cameras_merge_into_one_digest():
+    channel = RecordingNotifier()
+    alert_system = AlertSystem(notifiers=[channel], batch_window=60)
+
+    for camera_id in (1, 2, 3):
+        alert_system.send_alert(FRAME, fire(camera_id), camera_id=camera_id)
+    assert channel.sent == []
+
+    alert_system.flush()
+    assert len(channel.sent) == 1
+    message, snapshots, cameras = channel.sent[0]
+    assert "DIGEST" in message
+    assert cameras == [1, 2, 3]
+    assert len(snapshots) == 3
+    alert_system.close()
+
+
+def test_rate_limited_alerts_are_deferred_and_retried():
+    channel = RecordingNotifier(max_per_minute=1)
+    alert_system = AlertSystem(notifiers=[channel], batch_window=0)
+    alert_system.alert_cooldown = 0
+
+    alert_system.send_alert(FRAME, fire(1), camera_id=1)
+    alert_system.send_alert(FRAME, fire(2), camera_id=2)
+    assert [cameras for _, _, cameras in channel.sent] == [[1]]
+    assert [alert['camera_id'] for alert in alert_system.deferred_alerts[channel]] == [2]
+
+    # Refill the bucket instead of waiting a minute
+    channel.rate_limiter.tokens = 1.0
+    alert_system.flush()
+    assert [cameras for _, _, cameras in channel.sent] == [[1], [2]]
+    assert alert_system.deferred_alerts == {}
+    alert_system.close()
+
+
+def test_webhook_posts_json_over_one_connection(webhook_server):
+    host, port = webhook_server.server_address
+    channel = WebhookNotifier(f"http://{host}:{port}/alerts")
+
+    assert channel.notify("first", ["a.jpg"], [{'camera_id': 1}]) == DELIVERED
+    assert channel.notify("second", ["b.jpg"], [{'camera_id': 2}]) == DELIVERED
+    channel.close()
+
+    (first_client, first), (second_client, second) = webhook_server.requests
+    assert first == {'message': "first", 'snapshots': ["a.jpg"], 'alerts': [{'camera_id': 1}]}
+    assert second['message'] == "second"
+    assert first_client == second_client  # keep-alive connection reused
+
+
+def test_smtp_reuses_session_and_attaches_snapshots(smtp_server, tmp_path):
+    host, port = smtp_server.server_address
+    snapshot = tmp_path / "threat.jpg"
+    snapshot.write_bytes(b"\xff\xd8fake-jpeg")
+    channel = SMTPNotifier(host, port, 'cam@localhost', ['ops@localhost'])
+
+    assert channel.notify("🚨 SECURITY ALERT 🚨\nfire", [str(snapshot)]) == DELIVERED
+    assert channel.notify("🚨 SECURITY ALERT 🚨\nsmoke", []) == DELIVERED
+    channel.close()
+
+    assert smtp_server.connections == 1
+    assert len(smtp_server.messages) == 2
+    assert b'filename="threat.jpg"' in smtp_server.messages[0]
+
+
+def test_smtp_rate_limit_defers_instead_of_sending(smtp_server):
+    host, port = smtp_server.server_address
+    channel = SMTPNotifier(host, port, 'cam@localhost', ['ops@localhost'], max_per_minute=1)
+
+    assert channel.notify("first", []) == DELIVERED
+    assert channel.notify("second", []) == RATE_LIMITED
+    channel.close()
+
+    assert len(smtp_server.messages) == 1
@@ -0,0 +1,48 @@
+"""
+After-hours schedules follow runtime changes to the config
+"""
+
+from datetime import date, datetime
+
+import pytest
+
+from config import Config
+
+
+@pytest.fixture
+def config(tmp_path, monkeypatch):
+    # Config creates its snapshot and log directories in the working directory
+    monkeypatch.chdir(tmp_path)
+    return Config()
+
+
+def test_changing_restricted_hours_recompiles(config):
+    noon = datetime(2026, 10, 14, 12, 0)  # Wednesday
+    assert not config.is_after_hours(config.time_context(noon))
+
+    config.restricted_start_hour, config.restricted_end_hour = 11, 13
+    assert config.is_after_hours(config.time_context(noon))
+
+
+def test_in_place_holiday_and_override_edits_recompile(config):
+    noon = datetime(2026, 10, 14, 12, 0)
+
+    config.holidays.append(date(2026, 10, 14))
+    assert config.is_after_hours(config.time_context(noon))
+
+    config.camera_schedules[2] = [((1,), "11:00", "12:30")]
+    config.zone_schedules["dock"] = [((0,), 0, 1)]
+    ctx = config.time_context(datetime(2026, 10, 13, 12, 0))  # Tuesday, not a holiday
+    assert ctx.is_after_hours(camera_id=2)
+    assert not ctx.is_after_hours(camera_id=1)
+    assert not ctx.is_after_hours(zone="dock")
+    assert config.time_context(noon).is_after_hours(zone="dock")  # holiday applies to overrides
+
+
+def test_equal_restricted_hours_mean_never_restricted(config):
+    config.restricted_start_hour = config.restricted_end_hour = 22
+    for hour in (0, 12, 22, 23):
+        assert not config.is_after_hours(config.time_context(datetime(2026, 10, 14, hour, 0)))
+
+    config.holidays.append(date(2026, 10, 14))
+    assert config.is_after_hours(config.time_context(datetime(2026, 10, 14, 12, 0)))